@@ -1,98 +1,127 @@
 #!/usr/bin/env python3
 
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import sys
-import glob
-import numpy as np
-
-def plot_theta_analysis(csv_file):
-    """Generate plots from theta analysis CSV data"""
-
-    # Read the CSV file
+import argparse
+import os
+
+# Column types of theta_test.py's CSV output, so pandas doesn't have to infer them.
+# A categorical workload groups on small integer codes instead of Python strings,
+# and float32 halves the memory of the numeric columns.
+CSV_DTYPES = {
+    'workload': 'category',
+    'theta': 'float32',
+    'ops_per_sec': 'float32',
+    'commits_per_sec': 'float32',
+    'aborts_per_sec': 'float32',
+    'abort_rate': 'float32',
+}
+
+def load_theta_analysis(csv_file):
+    """Read theta analysis CSV data, returning None if it can't be loaded"""
     try:
-        df = pd.read_csv(csv_file)
+        return pd.read_csv(csv_file, dtype=CSV_DTYPES, engine='c')
     except FileNotFoundError:
         print(f"Error: Could not find file {csv_file}")
-        return
     except Exception as e:
         print(f"Error reading CSV file: {e}")
-        return
+    return None
+
+def split_by_workload(df):
+    """Return {workload: rows sorted by theta} for each workload in df"""
+    df = df.sort_values(['workload', 'theta'])
+    return dict(list(df.groupby('workload', sort=False, observed=True)))
+
+# Resolution of saved plots; --draft trades detail for much faster rendering
+DEFAULT_DPI = 300
+DRAFT_DPI = 120
+
+# Styling applied to every subplot, set once instead of per axis
+PLOT_STYLE = {
+    'axes.labelweight': 'bold',
+    'axes.grid': True,
+    'grid.alpha': 0.3,
+}
+
+def plot_theta_analysis(df, csv_file, dpi=DEFAULT_DPI):
+    """Generate plots from theta analysis data loaded from csv_file"""
+
+    # Imported here so callers that only want the summary table skip matplotlib's startup cost
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    # Pull each workload's columns out as NumPy arrays once, shared by all four plots
+    workloads = {}
+    for workload, workload_data in split_by_workload(df).items():
+        data = {col: workload_data[col].to_numpy() for col in workload_data.columns if col != 'workload'}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            data['success_rate'] = data['commits_per_sec'] / (data['commits_per_sec'] + data['aborts_per_sec']) * 100
+        workloads[workload] = data
 
     # Create figure with subplots
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('Theta Parameter Impact Analysis on Distributed KVS', fontsize=16, fontweight='bold')
-
-    # Colors for different workloads
-    colors = {'YCSB-A': '#e74c3c', 'YCSB-B': '#3498db'}
-    markers = {'YCSB-A': 'o', 'YCSB-B': 's'}
-
-    # Plot 1: Commit Rate vs Theta
-    for workload in df['workload'].unique():
-        workload_data = df[df['workload'] == workload].sort_values('theta')
-        ax1.plot(workload_data['theta'], workload_data['commits_per_sec'],
-                color=colors[workload], marker=markers[workload], linewidth=2,
-                markersize=8, label=f'{workload} (50% writes)' if workload == 'YCSB-A' else f'{workload} (5% writes)')
-
-    ax1.set_xlabel('Theta (Zipfian Skew Parameter)', fontweight='bold')
-    ax1.set_ylabel('Commits per Second', fontweight='bold')
-    ax1.set_title('Transaction Commit Rate vs Contention Level')
-    ax1.grid(True, alpha=0.3)
-    ax1.legend()
-    ax1.set_xlim(-0.05, 1.05)
-
-    # Plot 2: Abort Rate vs Theta
-    for workload in df['workload'].unique():
-        workload_data = df[df['workload'] == workload].sort_values('theta')
-        ax2.plot(workload_data['theta'], workload_data['abort_rate'],
-                color=colors[workload], marker=markers[workload], linewidth=2,
-                markersize=8, label=workload)
-
-    ax2.set_xlabel('Theta (Zipfian Skew Parameter)', fontweight='bold')
-    ax2.set_ylabel('Abort Rate (%)', fontweight='bold')
-    ax2.set_title('Transaction Abort Rate vs Contention Level')
-    ax2.grid(True, alpha=0.3)
-    ax2.legend()
-    ax2.set_xlim(-0.05, 1.05)
-
-    # Plot 3: Total Operations vs Theta
-    for workload in df['workload'].unique():
-        workload_data = df[df['workload'] == workload].sort_values('theta')
-        ax3.plot(workload_data['theta'], workload_data['ops_per_sec'],
-                color=colors[workload], marker=markers[workload], linewidth=2,
-                markersize=8, label=workload)
-
-    ax3.set_xlabel('Theta (Zipfian Skew Parameter)', fontweight='bold')
-    ax3.set_ylabel('Operations per Second', fontweight='bold')
-    ax3.set_title('Total Operation Rate vs Contention Level')
-    ax3.grid(True, alpha=0.3)
-    ax3.legend()
-    ax3.set_xlim(-0.05, 1.05)
-
-    # Plot 4: Transaction Success Rate vs Theta
-    for workload in df['workload'].unique():
-        workload_data = df[df['workload'] == workload].sort_values('theta')
-        success_rate = (workload_data['commits_per_sec'] / (workload_data['commits_per_sec'] + workload_data['aborts_per_sec'])) * 100
-        ax4.plot(workload_data['theta'], success_rate,
-                color=colors[workload], marker=markers[workload], linewidth=2,
-                markersize=8, label=workload)
-
-    ax4.set_xlabel('Theta (Zipfian Skew Parameter)', fontweight='bold')
-    ax4.set_ylabel('Transaction Success Rate (%)', fontweight='bold')
-    ax4.set_title('Transaction Success Rate vs Contention Level')
-    ax4.grid(True, alpha=0.3)
-    ax4.legend()
-    ax4.set_xlim(-0.05, 1.05)
-
-    # Adjust layout and save
-    plt.tight_layout()
-
-    # Save the plot
-    output_file = csv_file.replace('.csv', '_analysis.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    print(f"Plot saved as: {output_file}")
+    with plt.rc_context(PLOT_STYLE):
+        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
+        fig.suptitle('Theta Parameter Impact Analysis on Distributed KVS', fontsize=16, fontweight='bold')
+
+        # Colors for different workloads
+        colors = {'YCSB-A': '#e74c3c', 'YCSB-B': '#3498db'}
+        markers = {'YCSB-A': 'o', 'YCSB-B': 's'}
+
+        # Plot 1: Commit Rate vs Theta
+        for workload, data in workloads.items():
+            ax1.plot(data['theta'], data['commits_per_sec'],
+                    color=colors[workload], marker=markers[workload], linewidth=2,
+                    markersize=8, label=f'{workload} (50% writes)' if workload == 'YCSB-A' else f'{workload} (5% writes)')
+
+        ax1.set_xlabel('Theta (Zipfian Skew Parameter)')
+        ax1.set_ylabel('Commits per Second')
+        ax1.set_title('Transaction Commit Rate vs Contention Level')
+
+        # Plot 2: Abort Rate vs Theta
+        for workload, data in workloads.items():
+            ax2.plot(data['theta'], data['abort_rate'],
+                    color=colors[workload], marker=markers[workload], linewidth=2,
+                    markersize=8, label=workload)
+
+        ax2.set_xlabel('Theta (Zipfian Skew Parameter)')
+        ax2.set_ylabel('Abort Rate (%)')
+        ax2.set_title('Transaction Abort Rate vs Contention Level')
+
+        # Plot 3: Total Operations vs Theta
+        for workload, data in workloads.items():
+            ax3.plot(data['theta'], data['ops_per_sec'],
+                    color=colors[workload], marker=markers[workload], linewidth=2,
+                    markersize=8, label=workload)
+
+        ax3.set_xlabel('Theta (Zipfian Skew Parameter)')
+        ax3.set_ylabel('Operations per Second')
+        ax3.set_title('Total Operation Rate vs Contention Level')
+
+        # Plot 4: Transaction Success Rate vs Theta
+        for workload, data in workloads.items():
+            ax4.plot(data['theta'], data['success_rate'],
+                    color=colors[workload], marker=markers[workload], linewidth=2,
+                    markersize=8, label=workload)
+
+        ax4.set_xlabel('Theta (Zipfian Skew Parameter)')
+        ax4.set_ylabel('Transaction Success Rate (%)')
+        ax4.set_title('Transaction Success Rate vs Contention Level')
+
+        # Shared per-axes settings; label weight and grid come from PLOT_STYLE
+        axes = (ax1, ax2, ax3, ax4)
+        plt.setp(axes, xlim=(-0.05, 1.05))
+        for ax in axes:
+            ax.legend()
+
+        # Adjust layout and save
+        fig.tight_layout()
+
+        # Save the plot
+        output_file = csv_file.replace('.csv', '_analysis.png')
+        # Low zlib level: PNG compression dominates save time at high DPI
+        fig.savefig(output_file, dpi=dpi, bbox_inches='tight', pil_kwargs={'compress_level': 1})
+        print(f"Plot saved as: {output_file}")
 
     # Also save as PDF for better quality
     # pdf_file = csv_file.replace('.csv', '_analysis.pdf')
@@ -102,49 +131,68 @@ def plot_theta_analysis(csv_file):
     # Show the plot
     # plt.show()  # Commented out to avoid display issues in headless environment
 
-def create_summary_table(csv_file):
+def create_summary_table(df):
     """Create a summary table of the results"""
-    df = pd.read_csv(csv_file)
+    workloads = split_by_workload(df)
 
     print("\n" + "="*80)
     print("THETA ANALYSIS SUMMARY TABLE")
     print("="*80)
 
-    for workload in sorted(df['workload'].unique()):
+    for workload in sorted(workloads):
         print(f"\n{workload} Workload:")
         print("-" * 50)
-        workload_data = df[df['workload'] == workload].sort_values('theta')
+        workload_data = workloads[workload]
 
         print(f"{'Theta':<8} {'Commits/s':<12} {'Aborts/s':<12} {'Abort Rate':<12} {'Success Rate':<12}")
         print("-" * 60)
 
-        for _, row in workload_data.iterrows():
-            success_rate = (row['commits_per_sec'] / (row['commits_per_sec'] + row['aborts_per_sec'])) * 100 if (row['commits_per_sec'] + row['aborts_per_sec']) > 0 else 100
-            print(f"{row['theta']:<8.2f} {row['commits_per_sec']:<12.0f} {row['aborts_per_sec']:<12.0f} "
-                  f"{row['abort_rate']:<12.1f}% {success_rate:<12.1f}%")
+        rows = workload_data[['theta', 'commits_per_sec', 'aborts_per_sec', 'abort_rate']].itertuples(index=False, name=None)
+        for theta, commits, aborts, abort_rate in rows:
+            total = commits + aborts
+            success_rate = (commits / total) * 100 if total > 0 else 100
+            print(f"{theta:<8.2f} {commits:<12.0f} {aborts:<12.0f} "
+                  f"{abort_rate:<12.1f}% {success_rate:<12.1f}%")
 
 def main():
     """Main function to process CSV and generate plots"""
 
+    parser = argparse.ArgumentParser(description="Plot theta analysis results")
+    parser.add_argument('csv_file', nargs='?', help="theta analysis CSV (default: most recent theta_analysis_*.csv)")
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help=f"plot resolution (default: {DEFAULT_DPI})")
+    parser.add_argument('--draft', action='store_const', dest='dpi', const=DRAFT_DPI,
+                        help=f"quick low-resolution plot ({DRAFT_DPI} DPI)")
+    args = parser.parse_args()
+
     # Check for CSV file argument
-    if len(sys.argv) > 1:
-        csv_file = sys.argv[1]
+    if args.csv_file:
+        csv_file = args.csv_file
     else:
         # Look for the most recent theta analysis CSV file
-        csv_files = glob.glob("theta_analysis_*.csv")
-        if not csv_files:
+        csv_file = None
+        latest_mtime = -1
+        with os.scandir('.') as it:
+            for entry in it:
+                if entry.name.startswith('theta_analysis_') and entry.name.endswith('.csv'):
+                    mtime = entry.stat().st_mtime
+                    if mtime > latest_mtime:
+                        latest_mtime, csv_file = mtime, entry.name
+
+        if csv_file is None:
             print("No theta analysis CSV files found.")
-            print("Usage: python3 plot_theta_analysis.py [csv_file]")
+            print("Usage: python3 plot_theta_analysis.py [--draft | --dpi DPI] [csv_file]")
             print("   or: run theta_test.py first to generate data")
             return
 
-        # Use the most recent file
-        csv_file = max(csv_files, key=lambda x: x.split('_')[-1])
         print(f"Using most recent CSV file: {csv_file}")
 
+    df = load_theta_analysis(csv_file)
+    if df is None:
+        return
+
     # Generate plots and summary
-    plot_theta_analysis(csv_file)
-    create_summary_table(csv_file)
+    plot_theta_analysis(df, csv_file, dpi=args.dpi)
+    create_summary_table(df)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,78 +5,90 @@
 
 import os
 import glob
-import statistics
+import mmap
+import re
+
+import numpy as np
 
 LOG_DIR = "./logs/latest"
 
-total_ops_throughput = 0.0
-total_commit_throughput = 0.0
-total_abort_throughput = 0.0
-
-# Find all matching log files
-log_files = sorted(glob.glob(os.path.join(LOG_DIR, "kvsserver-*.log")))
-
-if not log_files:
-    print("No matching log files found.")
-    exit(0)
-
-for log_path in log_files:
-    node = os.path.basename(log_path).removeprefix("kvsserver-").removesuffix(".log")
-    ops_throughputs = []
-    commit_throughputs = []
-    abort_throughputs = []
-
-    with open(log_path) as f:
-        for line in f:
-            if "ops/s" in line:
-                parts = line.strip().split()
-                try:
-                    # Throughput value is the 2nd column in original awk ($2)
-                    ops_throughputs.append(float(parts[1]))
-                except (IndexError, ValueError):
-                    pass
-            elif "commit/s" in line:
-                parts = line.strip().split()
-                try:
-                    # Throughput value is the 2nd column in original awk ($2)
-                    commit_throughputs.append(float(parts[1]))
-                except (IndexError, ValueError):
-                    pass
-            elif "abort/s" in line:
-                parts = line.strip().split()
-                try:
-                    # Throughput value is the 2nd column in original awk ($2)
-                    abort_throughputs.append(float(parts[1]))
-                except (IndexError, ValueError):
-                    pass
-
-    if ops_throughputs:
-        median_ops = statistics.median(sorted(ops_throughputs))
-        print(f"{node} median {median_ops:.0f} op/s")
-        total_ops_throughput += median_ops
-    else:
-        print(f"{node} no ops/s data found")
-
-    if commit_throughputs:
-        median_commits = statistics.median(sorted(commit_throughputs))
-        print(f"{node} median {median_commits:.0f} commit/s")
-        total_commit_throughput += median_commits
-    else:
-        print(f"{node} no commit/s data found")
-
-    if abort_throughputs:
-        median_aborts = statistics.median(sorted(abort_throughputs))
-        print(f"{node} median {median_aborts:.0f} abort/s")
-        total_abort_throughput += median_aborts
-    else:
-        print(f"{node} no abort/s data found")
-
-print()
-print(f"total {total_ops_throughput:.0f} op/s")
-print(f"total {total_commit_throughput:.0f} commit/s")
-print(f"total {total_abort_throughput:.0f} abort/s")
-
-# Calculate and display abort rate
-if total_commit_throughput + total_abort_throughput > 0:
-    abort_rate = total_abort_throughput / (total_commit_throughput + total_abort_throughput) * 100
-    print(f"abort rate {abort_rate:.1f}%")
+# Server stats lines look like "ops/s 1234.56". The value must be a whole
+# well-formed number (malformed lines are skipped), so every captured token
+# is guaranteed to parse in the bulk np.fromstring call below.
+PAT = re.compile(rb"(?m)^\s*(ops|commit|abort)/s\s+(\d+(?:\.\d+)?)(?=\s|$)")
+
+def parse_log(log_path):
+    """Return the median ops/commit/abort throughput of one server log (None if absent)"""
+    matches = []
+
+    with open(log_path, "rb") as f:
+        # mmap can't map an empty file; a node that never printed stats has nothing to parse
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Throughput value is the 2nd column in original awk ($2)
+                matches = PAT.findall(mm)
+
+    medians = {"ops": None, "commit": None, "abort": None}
+    if not matches:
+        return medians
+
+    # Parse all values in one NumPy call rather than float() per line
+    kinds, values = zip(*matches)
+    kinds = np.array(kinds)
+    values = np.fromstring(b" ".join(values), sep=" ")
+
+    for kind in medians:
+        kind_values = values[kinds == kind.encode()]
+        if kind_values.size:
+            medians[kind] = float(np.median(kind_values))
+    return medians
+
+def summarize(log_dir=LOG_DIR):
+    """Summarize all server logs in log_dir, returning per-node medians and cluster totals"""
+    nodes = {}
+    totals = {"ops": 0.0, "commit": 0.0, "abort": 0.0}
+
+    for log_path in sorted(glob.glob(os.path.join(log_dir, "kvsserver-*.log"))):
+        node = os.path.basename(log_path).removeprefix("kvsserver-").removesuffix(".log")
+        nodes[node] = parse_log(log_path)
+        for kind, median in nodes[node].items():
+            if median is not None:
+                totals[kind] += median
+
+    abort_rate = None
+    if totals["commit"] + totals["abort"] > 0:
+        abort_rate = totals["abort"] / (totals["commit"] + totals["abort"]) * 100
+
+    return {
+        "nodes": nodes,
+        "ops_per_sec": totals["ops"],
+        "commits_per_sec": totals["commit"],
+        "aborts_per_sec": totals["abort"],
+        "abort_rate": abort_rate,
+    }
+
+def main():
+    summary = summarize(LOG_DIR)
+
+    if not summary["nodes"]:
+        print("No matching log files found.")
+        return
+
+    for node, medians in summary["nodes"].items():
+        for kind, unit in (("ops", "op/s"), ("commit", "commit/s"), ("abort", "abort/s")):
+            if medians[kind] is not None:
+                print(f"{node} median {medians[kind]:.0f} {unit}")
+            else:
+                print(f"{node} no {kind}/s data found")
+
+    print()
+    print(f"total {summary['ops_per_sec']:.0f} op/s")
+    print(f"total {summary['commits_per_sec']:.0f} commit/s")
+    print(f"total {summary['aborts_per_sec']:.0f} abort/s")
+
+    # Calculate and display abort rate
+    if summary["abort_rate"] is not None:
+        print(f"abort rate {summary['abort_rate']:.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,34 @@
 #!/usr/bin/env python3
 
+import argparse
+import heapq
 import subprocess
 import time
-import csv
 import os
+import mmap
 import re
+import shlex
+import signal
+import threading
 from datetime import datetime
 
+import pandas as pd
+
+LOG_DIR = "./logs/latest"
+
+# Log patterns
+_PAT_TPUT = re.compile(r'transfer throughput ([\d.]+) ops/s')
+# Server stats lines look like "commit/s 1234.56"
+_PAT_SERVER = re.compile(r'(commit|abort)/s\s+([\d.]+)')
+# One alternation over every client event, so each (mmap'd) client log is scanned once.
+# Group names match the results keys they count towards.
+_PAT_CLIENT = re.compile(
+    rb'(?P<successful_transfers>Transfer successful:)'
+    rb'|(?P<failed_transfers>Transfer failed:)'
+    rb'|(?P<integrity_violations>INTEGRITY VIOLATION:)'
+    rb'|(?P<balance_checks>Balance check passed:(?: total=\d+, balances=\[(?P<balances>[^\]]+)\])?)'
+)
+
 # Test configuration
 TESTS = [
     {"name": "Basic_Distributed", "servers": 2, "clients": 2, "duration": 30},
@@ -14,6 +36,43 @@ TESTS = [
     {"name": "Balanced_Distributed", "servers": 3, "clients": 1, "duration": 30}
 ]
 
+def wait_for_logs_stable(log_dir, expected_count, timeout=15, interval=0.5):
+    """Wait until expected_count kvs logs exist in log_dir and stop growing (False on timeout)"""
+    deadline = time.monotonic() + timeout
+    prev_sizes = None
+
+    while True:
+        sizes = {}
+        if os.path.isdir(log_dir):
+            with os.scandir(log_dir) as it:
+                for entry in it:
+                    if entry.name.startswith(("kvsserver-", "kvsclient-")) and entry.name.endswith(".log"):
+                        sizes[entry.name] = entry.stat().st_size
+
+        if len(sizes) >= expected_count and sizes == prev_sizes:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+
+        prev_sizes = sizes
+        time.sleep(interval)
+
+def stop_cluster(proc, grace=10):
+    """Terminate run-cluster.sh's whole process group, escalating to SIGKILL after grace seconds"""
+    # SIGTERM first so the script's cleanup trap can stop the remote processes;
+    # killing the group also closes the stdout pipe its ssh children hold open
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=grace)
+    except ProcessLookupError:
+        return
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
 def run_test(test_config):
     """Run a single bank transfer test and collect results"""
     print(f"\n{'='*60}")
@@ -23,22 +82,51 @@ def run_test(test_config):
     print(f"{'='*60}")
 
     # Run the test
-    cmd = f"./run-cluster.sh {test_config['servers']} {test_config['clients']} \"\" \"-workload xfer -secs {test_config['duration']}\""
-    print(f"Command: {cmd}")
+    cmd = ["./run-cluster.sh", str(test_config['servers']), str(test_config['clients']), "",
+           f"-workload xfer -secs {test_config['duration']}"]
+    print(f"Command: {shlex.join(cmd)}")
 
     try:
-        # Run the test and capture output
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=test_config['duration'] + 60)
-
-        if result.returncode != 0:
-            print(f"Error running test: {result.stderr}")
+        # Run the test, scanning its output line by line as it arrives.
+        # stderr is merged into stdout so neither pipe can fill up and stall the cluster.
+        # The cluster runs in its own session so a timeout can stop it as a whole.
+        timeout = test_config['duration'] + 60
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, bufsize=1, start_new_session=True)
+        timed_out = threading.Event()
+        watchdog = threading.Timer(timeout, lambda: (timed_out.set(), stop_cluster(proc)))
+        watchdog.start()
+
+        output = []
+        transfer_throughput = 0.0
+        try:
+            for line in proc.stdout:
+                output.append(line)
+                throughput_match = _PAT_TPUT.search(line)
+                if throughput_match:
+                    transfer_throughput = float(throughput_match.group(1))
+            proc.wait()
+        except KeyboardInterrupt:
+            # Ctrl-C no longer reaches the cluster's own session, so pass it on
+            stop_cluster(proc)
+            raise
+        finally:
+            watchdog.cancel()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        if proc.returncode != 0:
+            print(f"Error running test: {''.join(output[-20:])}")
             return None
 
         # Wait for logs to be written
-        time.sleep(5)
+        if not wait_for_logs_stable(LOG_DIR, test_config['servers'] + test_config['clients']):
+            print("Warning: logs still changing after timeout, parsing anyway")
 
         # Parse results from logs and output
-        results = parse_test_results(test_config, result.stdout, result.stderr)
+        results = parse_test_results(test_config, transfer_throughput)
         return results
 
     except subprocess.TimeoutExpired:
@@ -48,8 +136,8 @@ def run_test(test_config):
         print(f"Error running test: {e}")
         return None
 
-def parse_test_results(test_config, stdout, stderr):
-    """Parse test results from output and log files"""
+def parse_test_results(test_config, transfer_throughput=0.0):
+    """Parse test results from log files, given the throughput seen in the test output"""
     results = {
         'test_name': test_config['name'],
         'servers': test_config['servers'],
@@ -62,93 +150,97 @@ def parse_test_results(test_config, stdout, stderr):
         'integrity_violations': 0,
         'balance_checks': 0,
         'final_balances': [],
-        'transfer_throughput': 0.0,
+        'transfer_throughput': transfer_throughput,
         'commits_per_sec': 0.0,
         'aborts_per_sec': 0.0,
         'abort_rate': 0.0
     }
 
-    # Parse client output
-    if "transfer throughput" in stdout:
-        throughput_match = re.search(r'transfer throughput ([\d.]+) ops/s', stdout)
-        if throughput_match:
-            results['transfer_throughput'] = float(throughput_match.group(1))
-
-    # Parse server logs for detailed statistics
-    log_dir = "./logs/latest"
-    if os.path.exists(log_dir):
-        for log_file in os.listdir(log_dir):
-            if log_file.startswith("kvsserver-") and log_file.endswith(".log"):
-                log_path = os.path.join(log_dir, log_file)
-                results = parse_server_log(log_path, results)
-
-    # Parse client logs for transfer statistics
-    client_log_files = [f for f in os.listdir(log_dir) if f.startswith("kvsclient-")]
-    for client_log in client_log_files:
-        log_path = os.path.join(log_dir, client_log)
-        results = parse_client_log(log_path, results)
+    # Parse server logs for detailed statistics and client logs for transfer statistics
+    if os.path.exists(LOG_DIR):
+        with os.scandir(LOG_DIR) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                if entry.name.startswith("kvsserver-") and entry.name.endswith(".log"):
+                    stats = parse_server_log(entry.path)
+                elif entry.name.startswith("kvsclient-"):
+                    stats = parse_client_log(entry.path)
+                else:
+                    continue
+
+                # Counts and rates add up across nodes; the last balance check seen wins
+                for key, value in stats.items():
+                    if key == 'final_balances':
+                        results[key] = value
+                    else:
+                        results[key] += value
+
+    # Calculate abort rate
+    if results['commits_per_sec'] + results['aborts_per_sec'] > 0:
+        results['abort_rate'] = (results['aborts_per_sec'] /
+                                 (results['commits_per_sec'] + results['aborts_per_sec'])) * 100
 
     return results
 
-def parse_server_log(log_path, results):
+def parse_server_log(log_path):
     """Parse server log file for commit/abort statistics"""
+    stats = {'commits_per_sec': 0.0, 'aborts_per_sec': 0.0}
     try:
-        with open(log_path, 'r') as f:
-            lines = f.readlines()
-
         # Get the last few stats printouts
         commit_rates = []
         abort_rates = []
 
-        for line in lines:
-            if "commit/s" in line:
-                match = re.search(r'([\d.]+)', line)
-                if match:
-                    commit_rates.append(float(match.group(1)))
-            elif "abort/s" in line:
-                match = re.search(r'([\d.]+)', line)
-                if match:
-                    abort_rates.append(float(match.group(1)))
-
-        # Use median of recent measurements
+        with open(log_path, 'r') as f:
+            for line in f:
+                match = _PAT_SERVER.search(line)
+                if not match:
+                    continue
+                (commit_rates if match.group(1) == 'commit' else abort_rates).append(float(match.group(2)))
+
+        # Use the median of the three highest measurements, i.e. the second-highest sample;
+        # the trailing samples are partial or zero once clients finish
         if commit_rates:
-            results['commits_per_sec'] += sorted(commit_rates)[-3:][len(sorted(commit_rates)[-3:])//2] if len(commit_rates) >= 3 else commit_rates[-1]
+            stats['commits_per_sec'] = heapq.nlargest(3, commit_rates)[1] if len(commit_rates) >= 3 else commit_rates[-1]
         if abort_rates:
-            results['aborts_per_sec'] += sorted(abort_rates)[-3:][len(sorted(abort_rates)[-3:])//2] if len(abort_rates) >= 3 else abort_rates[-1]
+            stats['aborts_per_sec'] = heapq.nlargest(3, abort_rates)[1] if len(abort_rates) >= 3 else abort_rates[-1]
 
     except Exception as e:
         print(f"Error parsing server log {log_path}: {e}")
 
-    return results
+    return stats
 
-def parse_client_log(log_path, results):
+def parse_client_log(log_path):
     """Parse client log file for transfer and balance check statistics"""
+    stats = {'successful_transfers': 0, 'failed_transfers': 0, 'integrity_violations': 0, 'balance_checks': 0}
     try:
-        with open(log_path, 'r') as f:
-            content = f.read()
-
-        # Count different types of events
-        results['successful_transfers'] += len(re.findall(r'Transfer successful:', content))
-        results['failed_transfers'] += len(re.findall(r'Transfer failed:', content))
-        results['integrity_violations'] += len(re.findall(r'INTEGRITY VIOLATION:', content))
-        results['balance_checks'] += len(re.findall(r'Balance check passed:', content))
+        # Count different types of events, remembering the last balance check
+        balances_str = None
+        with open(log_path, 'rb') as f:
+            # mmap can't map an empty file, and an empty log has no events anyway
+            if os.fstat(f.fileno()).st_size > 0:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    for match in _PAT_CLIENT.finditer(mm):
+                        stats[match.lastgroup] += 1
+                        if match.group('balances') is not None:
+                            balances_str = match.group('balances').decode()
+                finally:
+                    mm.close()
 
         # Extract final balance information
-        balance_matches = re.findall(r'Balance check passed: total=(\d+), balances=\[([^\]]+)\]', content)
-        if balance_matches:
-            # Get the last balance check
-            total, balances_str = balance_matches[-1]
+        if balances_str is not None:
             # Handle both comma-separated and space-separated formats
             if ',' in balances_str:
                 balances = [int(x.strip()) for x in balances_str.split(',')]
             else:
                 balances = [int(x.strip()) for x in balances_str.split()]
-            results['final_balances'] = balances
+            stats['final_balances'] = balances
 
     except Exception as e:
         print(f"Error parsing client log {log_path}: {e}")
 
-    return results
+    return stats
 
 def save_results_to_csv(all_results, filename):
     """Save all test results to CSV file"""
@@ -163,19 +255,9 @@ def save_results_to_csv(all_results, filename):
         'transfer_throughput', 'commits_per_sec', 'aborts_per_sec', 'abort_rate'
     ]
 
-    with open(filename, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for result in all_results:
-            # Calculate abort rate
-            if result['commits_per_sec'] + result['aborts_per_sec'] > 0:
-                result['abort_rate'] = (result['aborts_per_sec'] /
-                                      (result['commits_per_sec'] + result['aborts_per_sec'])) * 100
-
-            # Convert final_balances list to string for CSV
-            result['final_balances'] = str(result['final_balances'])
-            writer.writerow(result)
+    # Convert final_balances list to string for CSV, without touching the caller's results
+    rows = [dict(result, final_balances=str(result['final_balances'])) for result in all_results]
+    pd.DataFrame(rows, columns=fieldnames).to_csv(filename, index=False)
 
 def generate_summary_report(all_results):
     """Generate a summary report of all tests"""
@@ -212,6 +294,10 @@ def generate_summary_report(all_results):
 
 def main():
     """Main function to run all bank transfer tests"""
+    parser = argparse.ArgumentParser(description="Run the bank transfer test suite")
+    parser.add_argument('--rebuild', action='store_true', help="run 'make clean' before building")
+    args = parser.parse_args()
+
     print("Starting Bank Transfer Test Suite")
     print(f"Timestamp: {datetime.now()}")
 
@@ -220,9 +306,11 @@ def main():
         print("Error: run-cluster.sh not found. Please run this script from the project root directory.")
         exit(1)
 
-    # Make sure binaries are built
+    # Make sure binaries are built; make's own dependency tracking skips up-to-date ones
     print("Building project...")
-    subprocess.run("make clean && make", shell=True, check=True)
+    if args.rebuild:
+        subprocess.run(["make", "clean"], check=True)
+    subprocess.run(["make", "-j", str(os.cpu_count() or 1)], check=True)
 
     all_results = []
 
@@ -230,10 +318,11 @@ def main():
         result = run_test(test_config)
         if result:
             all_results.append(result)
-
-        # Brief pause between tests
-        print("Waiting 10 seconds before next test...")
-        time.sleep(10)
+        else:
+            # A failed or timed-out run skipped run_test's own log wait, so let
+            # its cluster finish flushing logs before the next test starts
+            print("Waiting for logs to settle before next test...")
+            wait_for_logs_stable(LOG_DIR, test_config['servers'] + test_config['clients'])
 
     # Save results
     timestamp = int(time.time())
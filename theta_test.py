@@ -4,6 +4,7 @@ import subprocess
 import time
 import csv
 import os
+import importlib
 
 # Test configuration
 THETA_VALUES = [0, 0.3, 0.5, 0.7, 0.9, 0.99]
@@ -16,51 +17,40 @@ def run_test(workload, theta):
     print(f"Testing {workload} with theta={theta}...")
 
     # Run cluster test
-    cmd = f"./run-cluster.sh {CLUSTER_CONFIG} \"\" \"-workload {workload} -theta {theta} -secs {TEST_DURATION}\""
+    cmd = ["./run-cluster.sh", *CLUSTER_CONFIG.split(), "",
+           f"-workload {workload} -theta {theta} -secs {TEST_DURATION}"]
 
     try:
         # Run the test
-        subprocess.run(cmd, shell=True, check=True, capture_output=False)
+        subprocess.run(cmd, check=True, capture_output=False)
 
         # Wait a moment for logs to be written
         time.sleep(2)
 
-        # Parse results using report-tput.py
-        result = subprocess.run("python3 report-tput.py", shell=True, capture_output=True, text=True)
+        # Parse results in-process with report-tput.py's summarize().
+        # Its filename isn't a valid module name, so load it by name (cached after the first test).
+        report_tput = importlib.import_module("report-tput")
+        summary = report_tput.summarize(report_tput.LOG_DIR)
 
-        if result.returncode != 0:
-            print(f"Error running report-tput.py: {result.stderr}")
+        if not summary['nodes']:
+            print(f"Error: no server logs found in {report_tput.LOG_DIR}")
             return None
 
-        # Parse the output
-        lines = result.stdout.strip().split('\n')
-        ops_total = 0
-        commit_total = 0
-        abort_total = 0
-        abort_rate = 0
-
-        for line in lines:
-            if line.startswith("total") and "op/s" in line:
-                ops_total = float(line.split()[1])
-            elif line.startswith("total") and "commit/s" in line:
-                commit_total = float(line.split()[1])
-            elif line.startswith("total") and "abort/s" in line:
-                abort_total = float(line.split()[1])
-            elif line.startswith("abort rate"):
-                abort_rate = float(line.split()[2].rstrip('%'))
-
         return {
             'workload': workload,
             'theta': theta,
-            'ops_per_sec': ops_total,
-            'commits_per_sec': commit_total,
-            'aborts_per_sec': abort_total,
-            'abort_rate': abort_rate
+            'ops_per_sec': summary['ops_per_sec'],
+            'commits_per_sec': summary['commits_per_sec'],
+            'aborts_per_sec': summary['aborts_per_sec'],
+            'abort_rate': summary['abort_rate'] or 0
         }
 
     except subprocess.CalledProcessError as e:
         print(f"Error running test: {e}")
         return None
+    except Exception as e:
+        print(f"Error summarizing logs: {e}")
+        return None
 
 def main():
     """Run all tests and save results"""